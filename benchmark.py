@@ -0,0 +1,233 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import timeit
+from unittest import mock
+
+import numpy as np
+
+from classes import Song, Album, Artist
+
+BASELINE_PATH = './benchmark_baselines.json'
+SIZES = [10, 100, 1000, 10000]  # Number of albums per synthetic artist
+SONGS_PER_ALBUM = 12
+REPEAT = 5
+TOLERANCE = 1.5  # Allowed slowdown against the stored baseline
+CALIBRATION_SIZE = 20000
+GROWTH_TOLERANCE = 10.  # Allowed growth of the per-album cost from the smallest to the largest size
+
+
+def no_network(*args, **kwargs):
+    raise RuntimeError("Network access is disabled while benchmarking.")
+
+
+def make_album(artist, index, rng, num_songs=SONGS_PER_ALBUM):
+    """Create an album with pre-populated songs and ranks, so fetch_songs never hits the API."""
+    album = Album(f"Album {index}", f"album_{index}", artist, release_year=str(1960 + index % 60))
+    album.num_songs = num_songs
+    album.songs = [Song(f"Song {index}.{i + 1}", f"song_{index}_{i}", i + 1, album) for i in range(num_songs)]
+    for song in album.songs:
+        # Leave some songs unranked to exercise the NaN handling
+        song.rank_value = round(float(rng.uniform(0, 10)), 1) if rng.random() < 0.9 else None
+    album.e_value = round(float(rng.uniform(0, 10)), 1)
+    album.r_value = round(float(rng.uniform(0, 10)), 1)
+    return album
+
+
+def make_artist(num_albums, seed=0):
+    """Create an artist without calling Artist.__init__, which would search and fetch from Spotify."""
+    rng = np.random.default_rng(seed)
+    artist = Artist.__new__(Artist)
+    artist.name = f"Benchmark Artist {num_albums}"
+    artist.path = None  # Nothing is written to disk
+    artist.artist_id = f"artist_{num_albums}"
+    artist.albums = [make_album(artist, i, rng) for i in range(num_albums)]
+    return artist
+
+
+def bench_get_s(artist, saved_data):
+    for album in artist.albums:
+        album.get_s()
+
+
+def bench_calculate_final_score(artist, saved_data):
+    for album in artist.albums:
+        album.calculate_final_score()
+
+
+def bench_dump(artist, saved_data):
+    for album in artist.albums:
+        album.dump()
+
+
+def bench_set_ranks(artist, saved_data):
+    for album in artist.albums:
+        album.set_ranks([song.rank_value for song in album.songs])
+
+
+def bench_load_from_dict(artist, saved_data):
+    for album in artist.albums:
+        if album.name in saved_data:
+            album.load_from_dict(saved_data[album.name])
+
+
+def bench_to_dict(artist, saved_data):
+    artist.to_dict()
+
+
+def bench_sorted_albums(artist, saved_data):
+    artist.sorted_albums()
+
+
+BENCHMARKS = {
+    "Album.get_s": bench_get_s,
+    "Album.calculate_final_score": bench_calculate_final_score,
+    "Album.dump": bench_dump,
+    "Album.set_ranks": bench_set_ranks,
+    "Album.load_from_dict": bench_load_from_dict,
+    "Artist.to_dict": bench_to_dict,
+    "Artist.sorted_albums": bench_sorted_albums,
+}
+
+
+def calibration_loop():
+    """A fixed pure Python workload, to express timings relative to the current speed of the machine."""
+    items = [{"rank": i % 10, "name": str(i)} for i in range(CALIBRATION_SIZE)]
+    return sum(item["rank"] for item in items if item["name"])
+
+
+def time_benchmark(func, artist, saved_data, repeat=REPEAT):
+    """Return the best wall time (in seconds) of the benchmark, and its median time relative to the calibration loop.
+
+    Each run is paired with a calibration timed right before it, so a slow moment of the machine
+    affects both, and the median ignores the runs where it did not.
+    """
+    # Collect before timing, timeit disables the garbage collector during the runs, so collection
+    # pauses over the cyclic Song <-> Album references do not land in the measurement
+    gc.collect()
+    calibration_timer = timeit.Timer(calibration_loop)
+    benchmark_timer = timeit.Timer(lambda: func(artist, saved_data))
+    timings, relative = [], []
+    for _ in range(repeat):
+        calibration = min(calibration_timer.repeat(repeat=3, number=1))
+        seconds = benchmark_timer.timeit(number=1)
+        timings.append(seconds)
+        relative.append(seconds / calibration)
+    return min(timings), statistics.median(relative)
+
+
+def run_benchmarks(sizes=SIZES, repeat=REPEAT, names=None):
+    """Run every benchmark (or the given ones) for every size.
+
+    Returns {benchmark name: {size: time}}, with times in units of the calibration loop,
+    so runs on a busier or slower machine remain comparable.
+    """
+    benchmarks = {name: func for name, func in BENCHMARKS.items() if names is None or name in names}
+    results = {name: {} for name in benchmarks}
+    with mock.patch('classes.requests.get', side_effect=no_network), \
+            mock.patch('classes.get_headers', side_effect=no_network):
+        for size in sizes:
+            artist = make_artist(size)
+            # Saved data is built once, outside the timed region, round tripped through JSON like the ranking file
+            saved_data = json.loads(json.dumps(artist.to_dict()))
+            for name, func in benchmarks.items():
+                seconds, units = time_benchmark(func, artist, saved_data, repeat)
+                results[name][str(size)] = units
+                print(f"{name:<30} n={size:<6} {seconds * 1000:10.3f} ms {units:10.3f} units")
+    return results
+
+
+def check_growth(results, growth_tolerance=GROWTH_TOLERANCE):
+    """Flag benchmarks whose per-album cost grows with size (e.g. an accidental O(n^2))."""
+    failures = []
+    for name, timings in results.items():
+        sizes = sorted(int(size) for size in timings)
+        if len(sizes) < 2:
+            continue
+        smallest, largest = sizes[0], sizes[-1]
+        per_album_small = timings[str(smallest)] / smallest
+        per_album_large = timings[str(largest)] / largest
+        if per_album_large > per_album_small * growth_tolerance:
+            failures.append(f"{name}: per-album time grew {per_album_large / per_album_small:.1f}x "
+                            f"from n={smallest} to n={largest}")
+    return failures
+
+
+def check_baseline(results, baseline, tolerance=TOLERANCE):
+    """Compare the results against the stored baseline.
+
+    A benchmark fails only if it is slower than the tolerance at two or more sizes (or at its only
+    compared size), so a single noisy measurement does not fail the run.
+    """
+    failures = []
+    for name, timings in results.items():
+        compared = {size: (units, baseline["results"].get(name, {}).get(size)) for size, units in timings.items()}
+        compared = {size: (units, expected) for size, (units, expected) in compared.items() if expected is not None}
+        slow = [f"n={size}: {units / expected:.2f}x" for size, (units, expected) in compared.items()
+                if units > expected * tolerance]
+        if slow and len(slow) >= min(2, len(compared)):
+            failures.append(f"{name} slower than baseline at {', '.join(slow)}")
+    return failures
+
+
+def load_baseline(path=BASELINE_PATH):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def save_baseline(results, repeat, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump({"repeat": repeat, "unit": "calibration", "results": results}, f, indent=4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the scoring and serialization code.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of albums to benchmark")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per measurement (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed slowdown against the baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="path of the baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    baseline = None if args.save else load_baseline(args.baseline)
+    if baseline is not None and baseline.get("unit") != "calibration":
+        print(f"The baseline at {args.baseline} holds absolute times from an older version, save a new baseline")
+        return 1
+    if baseline is not None and baseline.get("repeat") != args.repeat:
+        # The best of a different number of runs is not comparable
+        print(f"The baseline at {args.baseline} was measured with --repeat {baseline.get('repeat')}, "
+              f"run with the same --repeat or save a new baseline")
+        return 1
+
+    results = run_benchmarks(args.sizes, args.repeat)
+    failures = check_growth(results)
+
+    if args.save:
+        save_baseline(results, args.repeat, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif baseline is None:
+        print(f"No baseline found at {args.baseline}, run with --save to create one")
+    else:
+        slow = check_baseline(results, baseline, args.tolerance)
+        if slow:
+            # Measure the slow benchmarks again, and only fail on a regression that shows up twice
+            print("\nConfirming slow benchmarks:")
+            slow_names = [name for name in results if any(failure.startswith(f"{name} ") for failure in slow)]
+            rerun = run_benchmarks(args.sizes, args.repeat, slow_names)
+            failures += check_baseline(rerun, baseline, args.tolerance)
+
+    if failures:
+        print("\nPerformance regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,24 @@ import numpy as np
 from consts import PATH
 from utils import get_headers, choose_artist_headless
 
+LEGACY_PAGE_SIZE = 20 # Default page size of /albums/{id}/tracks, all that was fetched (and ranked) before paging
+
+
+def saved_ranks_fit(num_ranks, num_songs):
+    """Whether saved ranks can be applied by position to an album with num_songs songs.
+
+    Files saved before paging hold only the first page of ranks of longer albums, those are padded.
+    Any other difference (e.g. a reissue with bonus tracks) is a mismatch, and the ranks are reset.
+    """
+    return num_ranks == num_songs or num_ranks == LEGACY_PAGE_SIZE < num_songs
+
+
+def final_score(s_value, e_value, r_value):
+    """Combine the song average, cohesive experience and replayability into the album score."""
+    if pd.isna(s_value) or e_value is None or r_value is None:
+        return None
+    return max([min([s_value + (e_value + r_value)/10 - 1, 10.]), 0.])
+
 
 class Song:
     def __init__(self, name, song_id, song_num, album):
@@ -64,28 +82,47 @@ class Album:
     def fetch_songs(self):
         """Fetches the songs in this album from the Spotify API."""
         if self.songs is None:
-            songs_url = f'https://api.spotify.com/v1/albums/{self.album_id}/tracks'
-            headers = get_headers()
-
-            response = requests.get(songs_url, headers=headers)
-
-            if response.status_code == 200:
-                tracks_data = response.json()
-                self.num_songs = len(tracks_data['items'])
-                self.songs = [Song(track['name'], track['id'], i+1, self)
-                              for i, track in enumerate(tracks_data['items'])]
-                if self.ranks is not None and len(self.ranks) == len(self.songs):
-                     # Apply loaded ranks if available and match song count
-                     for song, rank in zip(self.songs, self.ranks):
-                        song.rank_value = rank if pd.notna(rank) else None
-                else:
-                    # Initialize ranks with None if no saved data or mismatch
-                    self.ranks = np.array([None] * self.num_songs, dtype=object)
-            else:
+            for _ in self.iter_songs():
+                pass
+
+    def iter_songs(self):
+        """Yield the songs in this album page by page, as they are fetched from the Spotify API.
+
+        Loaded ranks are applied once the whole tracklist is known, as they are matched to it by position.
+        """
+        if self.songs is not None:
+            yield from self.songs
+            return
+
+        songs_url = f'https://api.spotify.com/v1/albums/{self.album_id}/tracks'
+        headers = get_headers()
+        params = {'limit': 50}
+        songs = []
+
+        while songs_url:
+            response = requests.get(songs_url, headers=headers, params=params)
+
+            if response.status_code != 200:
                 print(f"Error fetching songs for album {self.name}: {response.status_code}")
                 self.songs = []
                 self.num_songs = 0
                 self.ranks = np.array([], dtype=object)
+                return
+
+            tracks_data = response.json()
+            self.num_songs = tracks_data.get('total', len(tracks_data['items']))
+            for track in tracks_data['items']:
+                song = Song(track['name'], track['id'], len(songs)+1, self)
+                songs.append(song)
+                yield song
+            songs_url = tracks_data.get('next')
+            params = None # The next URL already includes the query
+
+        self.songs = songs
+        self.num_songs = len(songs)
+        if self.ranks is None or not self.apply_ranks():
+            # Initialize ranks with None if no saved data or mismatch
+            self.ranks = np.array([None] * self.num_songs, dtype=object)
 
 
     # Removed display_cover, get_experience_and_replay, rank methods
@@ -94,11 +131,7 @@ class Album:
     def calculate_final_score(self):
         """Calculate the final score of the album."""
         self.get_s() # Ensure s_value is updated
-        if pd.isna(self.s_value) or self.e_value is None or self.r_value is None:
-            self.final_score = None
-        else:
-            # Formula as previously defined
-            self.final_score = max([min([self.s_value + (self.e_value + self.r_value)/10 - 1, 10.]), 0.])
+        self.final_score = final_score(self.s_value, self.e_value, self.r_value)
 
     def get_final_score(self):
         """Return the final score, recalculating if needed."""
@@ -109,12 +142,20 @@ class Album:
         """Set the ranks from a list (e.g., loaded from JSON)."""
         # Convert list of ranks (including None) to numpy array with nan for missing
         self.ranks = np.array([rank if rank is not None else np.nan for rank in ranks_list], dtype=object)
-        if self.songs is not None and len(self.ranks) == len(self.songs):
-            for song, rank in zip(self.songs, self.ranks):
-                 song.rank_value = rank if pd.notna(rank) else None
+        self.apply_ranks()
         # Recalculate scores after setting ranks
         self.calculate_final_score()
 
+    def apply_ranks(self):
+        """Apply the ranks array to the songs by position. Returns False if it does not fit the tracklist."""
+        if self.songs is None or not saved_ranks_fit(len(self.ranks), len(self.songs)):
+            return False
+        # Pad ranks saved before paging with nan for the songs after the first page
+        self.ranks = np.array(list(self.ranks) + [np.nan] * (len(self.songs) - len(self.ranks)), dtype=object)
+        for song, rank in zip(self.songs, self.ranks):
+             song.rank_value = rank if pd.notna(rank) else None
+        return True
+
     def get_s(self, weighted=False):
         """Calculate the average song score (s_value), optionally weighted by duration."""
         self.fetch_songs()
@@ -147,11 +188,12 @@ class Album:
 
         return self.s_value
 
-    def set_e_r(self, e_value, r_value):
+    def set_e_r(self, e_value, r_value, recalculate=True):
         """Set the album's experience and replayability scores."""
         self.e_value = e_value
         self.r_value = r_value
-        self.calculate_final_score() # Recalculate final score
+        if recalculate:
+            self.calculate_final_score() # Recalculate final score
 
     def load_from_dict(self, data):
         """Load album data from a dictionary (e.g., from JSON)."""
@@ -206,8 +248,71 @@ class Album:
         return df
 
 
+class AlbumSummary:
+    """Text lines of an album's ranking summary (like Album.show_rank), updated row by row."""
+    SUMMARY_NAMES = ["Song average", "Cohesive experience", "Replayability", "Total score"]
+    SCORE_WIDTH = 5
+
+    def __init__(self, album, float_format="{:.1f}"):
+        album.fetch_songs()
+        self.album = album
+        self.float_format = float_format
+        self.ranks = [song.rank_value for song in album.songs]
+        ranked = [rank for rank in self.ranks if rank is not None]
+        # Keep a running sum, so a changed song does not require going over the whole album
+        self.rank_sum = sum(ranked)
+        self.rank_count = len(ranked)
+        self.name_width = max(len(name) for name in [song.name for song in album.songs] + self.SUMMARY_NAMES + ["name"])
+        self.lines = [self.format_row("name", "score")]
+        self.lines += [self.format_row(song.name, rank) for song, rank in zip(album.songs, self.ranks)]
+        self.lines += [self.format_row(name, score) for name, score in zip(self.SUMMARY_NAMES, self.summary_scores())]
+
+    def format_row(self, name, score):
+        if not isinstance(score, str):
+            score = self.float_format.format(score) if pd.notna(score) else "NaN"
+        return f"{name:>{self.name_width}} {score:>{self.SCORE_WIDTH}}"
+
+    def summary_scores(self):
+        """Compute the summary scores and store them in the album, as Album.get_s would."""
+        self.album.s_value = self.rank_sum / self.rank_count if self.rank_count else np.nan
+        self.album.final_score = final_score(self.album.s_value, self.album.e_value, self.album.r_value)
+        return [self.album.s_value, self.album.e_value, self.album.r_value, self.album.final_score]
+
+    def set_e_r(self, e_value, r_value):
+        """Set the album's e and r values. Returns the changed lines, like update."""
+        # The final score is recalculated by update from the running song average, not by going over the songs
+        self.album.set_e_r(e_value, r_value, recalculate=False)
+        return self.update()
+
+    def update(self, song_index=None):
+        """Recompute the rows affected by a change to the given song (or to e and r if None).
+
+        Returns a dictionary of line index to the new text, for the lines that changed.
+        """
+        changed = {}
+        if song_index is not None:
+            old_rank, new_rank = self.ranks[song_index], self.album.songs[song_index].rank_value
+            if old_rank is not None:
+                self.rank_sum -= old_rank
+                self.rank_count -= 1
+            if new_rank is not None:
+                self.rank_sum += new_rank
+                self.rank_count += 1
+            self.ranks[song_index] = new_rank
+            changed[song_index + 1] = self.format_row(self.album.songs[song_index].name, new_rank)
+
+        first_summary_line = len(self.ranks) + 1
+        for i, (name, score) in enumerate(zip(self.SUMMARY_NAMES, self.summary_scores())):
+            changed[first_summary_line + i] = self.format_row(name, score)
+
+        changed = {i: line for i, line in changed.items() if line != self.lines[i]}
+        for i, line in changed.items():
+            self.lines[i] = line
+        return changed
+
+
 class Artist:
-    def __init__(self, name=None, path=PATH):
+    def __init__(self, name=None, path=PATH, lazy=False):
         self.name = name # This will be updated after fetching the artist ID
         self.path = path
         # Use the refactored headless choose_artist
@@ -217,7 +322,9 @@ class Artist:
 
         self.name = self.fetch_artist_name() # Fetch and set the official artist name
         self.albums = None
-        self.fetch_albums() # Fetch albums after getting artist ID and name
+        self.albums_incomplete = False # Set if fetching the albums failed partway
+        if not lazy:
+            self.fetch_albums() # Fetch albums after getting artist ID and name
         # Removed ipywidgets related attributes like album_dropdown
 
     def fetch_artist_name(self):
@@ -237,31 +344,51 @@ class Artist:
     def fetch_albums(self):
         """Fetches the albums for this artist from the Spotify API."""
         if self.albums is None:
-            albums_url = f'https://api.spotify.com/v1/artists/{self.artist_id}/albums'
-            headers = get_headers()
-            params = {
-                'include_groups': 'album',
-                'limit': 50
-            }
+            for _ in self.iter_albums():
+                pass
 
-            try:
+    def iter_albums(self):
+        """Yield the albums of this artist page by page, with their saved rankings loaded."""
+        if self.albums is not None:
+            yield from self.albums
+            return
+
+        albums_url = f'https://api.spotify.com/v1/artists/{self.artist_id}/albums'
+        headers = get_headers()
+        params = {
+            'include_groups': 'album',
+            'limit': 50
+        }
+        ranking_data = self.read_ranking() or {}
+        album_objects = []
+        self.albums_incomplete = False
+
+        try:
+            while albums_url:
                 response = requests.get(albums_url, headers=headers, params=params)
                 response.raise_for_status() # Raise an exception for bad status codes
                 albums_data = response.json()
-                album_objects = []
                 for album_data in albums_data.get('items', []):
                     cover_url = album_data['images'][0]['url'] if album_data.get('images') else None
                     # Extract release year safely, handle potential errors
                     release_year = album_data.get('release_date', 'Unknown').split("-")[0]
-                    album_objects.append(Album(album_data.get('name', 'Unknown Album'), album_data.get('id'), self, cover_url, release_year))
-                self.albums = album_objects
-                self.load_ranking() # Attempt to load ranking data after fetching albums
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching albums for artist {self.name}: {e}")
-                self.albums = [] # Initialize with an empty list if fetching fails
+                    album = Album(album_data.get('name', 'Unknown Album'), album_data.get('id'), self, cover_url, release_year)
+                    if album.name in ranking_data:
+                        album.load_from_dict(ranking_data[album.name])
+                    album_objects.append(album)
+                    yield album
+                albums_url = albums_data.get('next')
+                params = None # The next URL already includes the query
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching albums for artist {self.name}: {e}")
+            # save_rankings keeps the saved entries of the albums that were not fetched
+            self.albums_incomplete = True
+        # Keep whatever was fetched (an empty list if fetching failed right away)
+        self.albums = album_objects
 
     def to_dict(self):
         """Convert the artist's ranking data to a dictionary for saving."""
+        self.fetch_albums()
         # Use album.dump() which already handles returning None for unranked albums
         album_rankings = {album.name: album.dump() for album in self.albums if album.dump() is not None}
         return album_rankings
@@ -269,6 +396,12 @@ class Artist:
     def save_rankings(self):
         """Save the ranking information of all albums in the artist to a JSON file."""
         ranking_data = self.to_dict()
+        if self.albums_incomplete:
+            # Keep the saved entries of the albums that failed to fetch, instead of erasing them.
+            # When all albums were fetched, entries of albums no longer on Spotify are dropped as before
+            loaded_names = {album.name for album in self.albums}
+            saved_data = self.read_ranking() or {}
+            ranking_data.update({name: data for name, data in saved_data.items() if name not in loaded_names})
         # Ensure the directory exists before saving
         os.makedirs(self.path, exist_ok=True)
         file_path = os.path.join(self.path, f"{self.name}.json")
@@ -279,30 +412,31 @@ class Artist:
         except IOError as e:
             print(f"Error saving rankings to {file_path}: {e}")
 
-    def load_ranking(self):
-        """Load the ranking information for the artist from a JSON file."""
+    def read_ranking(self):
+        """Read the artist's ranking file. Returns None if it does not exist or cannot be read."""
         file_path = os.path.join(self.path, f"{self.name}.json")
         if os.path.exists(file_path):
             try:
                 with open(file_path, 'r') as f:
-                    data = json.load(f)
-                # Assuming albums are already fetched before calling load_ranking
-                if self.albums is not None:
-                    for album in self.albums:
-                        if album.name in data:
-                            album.load_from_dict(data[album.name])
-                # print(f"Rankings loaded from {file_path}") # Optional: Add confirmation message
+                    return json.load(f)
             except (IOError, json.JSONDecodeError) as e:
                 print(f"Error loading rankings from {file_path}: {e}")
         else:
             print(f"No ranking file found at {file_path}") # Optional: Add info message
+        return None
 
-    def sorted_albums(self):
-        """Return a DataFrame of ranked albums sorted by final score."""
+    def ranked_albums(self):
+        """Return a list of the ranked albums sorted by final score."""
+        self.fetch_albums()
         # Filter albums that have a final score and sort them
         ranked_albums = [album for album in self.albums if album.get_final_score() is not None]
         # Sort albums by final score in descending order
         ranked_albums.sort(key=lambda album: album.final_score, reverse=True)
+        return ranked_albums
+
+    def sorted_albums(self):
+        """Return a DataFrame of ranked albums sorted by final score."""
+        ranked_albums = self.ranked_albums()
 
         if not ranked_albums:
             return pd.DataFrame({"name": [], "year": [], "score": []}) # Return empty DataFrame if no albums are ranked
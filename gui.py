@@ -5,7 +5,26 @@ from PIL import ImageTk, Image
 from io import BytesIO
 from enum import Enum
 
-from classes import Artist
+from classes import Artist, AlbumSummary
+
+SAVE_DELAY_MS = 1000 # Changes are saved this long after the last one, so a series of slider moves is saved once
+
+def set_text_lines(text_widget, lines):
+    """Replace the whole content of a read-only Text widget."""
+    text_widget.config(state=tk.NORMAL)
+    text_widget.delete(1.0, tk.END)
+    text_widget.insert(tk.END, "\n".join(lines))
+    text_widget.config(state=tk.DISABLED)
+
+
+def patch_text_lines(text_widget, changes):
+    """Replace only the given lines ({line index: text}) of a read-only Text widget."""
+    if changes:
+        text_widget.config(state=tk.NORMAL)
+        for i, line in changes.items():
+            text_widget.delete(f"{i + 1}.0", f"{i + 1}.end")
+            text_widget.insert(f"{i + 1}.0", line)
+        text_widget.config(state=tk.DISABLED)
 
 
 class MusicRankingApp(tk.Tk):
@@ -17,8 +36,10 @@ class MusicRankingApp(tk.Tk):
 
         self.artist = None
         self.current_album = None
+        self.pending_save = None # after() ID of a scheduled save
 
         self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def create_widgets(self):
         self.container = ttk.Frame(self)
@@ -40,7 +61,8 @@ class MusicRankingApp(tk.Tk):
         try:
             # PATH for saving data - adjust as needed for a standalone app
             # For a standalone app, you might use a directory relative to the script or user's home
-            self.artist = Artist(name=artist_name)
+            # Albums are fetched by the album list page, so they show up as they arrive
+            self.artist = Artist(name=artist_name, lazy=True)
             self.show_album_list()
         except ValueError as e:
             messagebox.showerror("Artist Not Found", str(e))
@@ -49,8 +71,8 @@ class MusicRankingApp(tk.Tk):
 
     def show_album_list(self):
         album_list_frame = self.frames[Pages.AlbumList]
-        album_list_frame.load_albums(self.artist.albums)
         self.show_frame(Pages.AlbumList)
+        album_list_frame.load_albums(self.artist.iter_albums())
 
     def rank_album(self, album):
         self.current_album = album
@@ -59,12 +81,29 @@ class MusicRankingApp(tk.Tk):
         self.show_frame(Pages.AlbumRank)
 
     def album_ranking_complete(self):
-        self.artist.save_rankings() # Save after ranking an album
+        self.save_rankings() # Save pending changes after ranking an album
         self.show_album_list() # Return to album list
 
+    def schedule_save(self):
+        """Save the rankings shortly after the last change, instead of rewriting the file on every event."""
+        if self.pending_save is not None:
+            self.after_cancel(self.pending_save)
+        self.pending_save = self.after(SAVE_DELAY_MS, self.save_rankings)
+
+    def save_rankings(self):
+        """Save the rankings now if a save is scheduled."""
+        if self.pending_save is not None:
+            self.after_cancel(self.pending_save) # In case it is flushed before it is due
+            self.pending_save = None
+            self.artist.save_rankings()
+
+    def on_close(self):
+        self.save_rankings() # Don't lose a scheduled save if the window is closed
+        self.destroy()
+
     def show_ranking(self):
         show_ranking_frame = self.frames[Pages.ShowRank]
-        show_ranking_frame.load_ranking(self.artist.sorted_albums())
+        show_ranking_frame.load_ranking(self.artist.ranked_albums())
         self.show_frame(Pages.ShowRank)
 
     def go_back_to_menu(self):
@@ -120,12 +159,15 @@ class AlbumListPage(ttk.Frame):
         self.albums = [] # To store album objects
 
     def load_albums(self, albums):
-        self.albums = albums
+        """Fill the listbox from an iterable of albums, drawing each one as soon as it arrives."""
+        self.albums = []
         self.album_listbox.delete(0, tk.END)
-        for album in self.albums:
+        self.rank_button.config(state=tk.DISABLED) # Disable button until an album is selected
+        for album in albums:
+            self.albums.append(album)
             score_str = f" ({album.get_final_score():.2f})" if album.get_final_score() is not None else ""
             self.album_listbox.insert(tk.END, f"{album.name} - {album.release_year}{score_str}")
-        self.rank_button.config(state=tk.DISABLED) # Disable button until an album is selected
+            self.update_idletasks() # Redraw before fetching the next album
 
     def on_album_select(self, event):
         if self.album_listbox.curselection():
@@ -147,6 +189,8 @@ class AlbumRankingPage(ttk.Frame):
         self.controller = controller
         self.album = None
         self.current_song = None
+        self.current_song_index = None
+        self.summary = None # AlbumSummary of the current album
         # self.preview_audio = None # To hold the loaded audio data
 
         self.album_name_label = ttk.Label(self, text="")
@@ -207,13 +251,13 @@ class AlbumRankingPage(ttk.Frame):
 
         # Load songs into listbox
         self.song_listbox.delete(0, tk.END)
-        self.album.fetch_songs()
-        if self.album.songs:
-            for song in self.album.songs:
-                rank_str = f" ({song.rank_value:.1f})" if song.rank_value is not None else ""
-                self.song_listbox.insert(tk.END, f"{song.name}{rank_str}")
+        for song in self.album.iter_songs():
+            rank_str = f" ({song.rank_value:.1f})" if song.rank_value is not None else ""
+            self.song_listbox.insert(tk.END, f"{song.name}{rank_str}")
+            self.update_idletasks() # Redraw while the rest of the songs are fetched
         self.on_song_select(None) # Trigger initial song selection state
 
+        self.summary = None # Built for the new album by update_ranking_summary
         self.update_ranking_summary()
 
     def load_album_cover(self):
@@ -235,14 +279,15 @@ class AlbumRankingPage(ttk.Frame):
     def on_album_slider_release(self, event):
         """Update album e and r values when sliders are released."""
         if self.album:
-            self.album.set_e_r(self.experience_slider.get(), self.replay_slider.get())
-            self.update_ranking_summary()
-            self.controller.artist.save_rankings()
+            changes = self.summary.set_e_r(self.experience_slider.get(), self.replay_slider.get())
+            patch_text_lines(self.ranking_text, changes)
+            self.controller.schedule_save()
 
     def on_song_select(self, event):
         selected_index = self.song_listbox.curselection()
         if selected_index and self.album and self.album.songs:
             song_index = selected_index[0]
+            self.current_song_index = song_index
             self.current_song = self.album.songs[song_index]
             # Set song rank slider value
             self.song_rank_slider.set(self.current_song.rank_value if self.current_song.rank_value is not None else 5.0)
@@ -255,6 +300,7 @@ class AlbumRankingPage(ttk.Frame):
 
         else:
             self.current_song = None
+            self.current_song_index = None
             self.song_rank_slider.set(5.0)
             # self.preview_button.config(state=tk.DISABLED)
 
@@ -263,18 +309,18 @@ class AlbumRankingPage(ttk.Frame):
         if self.current_song:
             rank_value = round(self.song_rank_slider.get(), 1) # Round to one decimal place
             self.current_song.set_rank(rank_value)
-            self.update_song_listbox() # Update song listbox to show new rank
-            self.update_ranking_summary()
-            self.controller.artist.save_rankings()
+            self.update_song_row(self.current_song_index) # Update song listbox to show new rank
+            self.update_ranking_summary(self.current_song_index)
+            self.controller.schedule_save()
 
-    def update_song_listbox(self):
-        """Update the song listbox to reflect current song ranks."""
+    def update_song_row(self, song_index):
+        """Update the song's row in the listbox to reflect its current rank."""
         if self.album and self.album.songs:
             selected_index = self.song_listbox.curselection() # Preserve selection
-            self.song_listbox.delete(0, tk.END)
-            for song in self.album.songs:
-                rank_str = f" ({song.rank_value:.1f})" if song.rank_value is not None else ""
-                self.song_listbox.insert(tk.END, f"{song.name}{rank_str}")
+            song = self.album.songs[song_index]
+            rank_str = f" ({song.rank_value:.1f})" if song.rank_value is not None else ""
+            self.song_listbox.delete(song_index)
+            self.song_listbox.insert(song_index, f"{song.name}{rank_str}")
             if selected_index: # Restore selection
                  self.song_listbox.selection_set(selected_index[0])
 
@@ -318,14 +364,14 @@ class AlbumRankingPage(ttk.Frame):
     #     else:
     #         messagebox.showinfo("No Preview", "No preview available for this song.")
 
-    def update_ranking_summary(self):
-        """Update the text widget with the current ranking summary."""
+    def update_ranking_summary(self, song_index=None):
+        """Update the text widget with the current ranking summary, rewriting only the changed lines."""
         if self.album:
-            df = self.album.show_rank()
-            self.ranking_text.config(state=tk.NORMAL)
-            self.ranking_text.delete(1.0, tk.END)
-            self.ranking_text.insert(tk.END, df.to_string(index=False, float_format=lambda f: f"{f:.1f}"))
-            self.ranking_text.config(state=tk.DISABLED)
+            if self.summary is None or self.summary.album is not self.album:
+                self.summary = AlbumSummary(self.album)
+                set_text_lines(self.ranking_text, self.summary.lines)
+            else:
+                patch_text_lines(self.ranking_text, self.summary.update(song_index))
 
 
 class ShowRankingPage(ttk.Frame):
@@ -342,14 +388,25 @@ class ShowRankingPage(ttk.Frame):
         self.back_button = ttk.Button(self, text="Back to Albums", command=self.controller.go_back_to_menu)
         self.back_button.pack(pady=10)
 
-    def load_ranking(self, ranking_df):
-        self.ranking_text.config(state=tk.NORMAL)
-        self.ranking_text.delete(1.0, tk.END)
-        if not ranking_df.empty:
-            self.ranking_text.insert(tk.END, ranking_df.to_string(index=False, float_format=lambda f: f"{f:.2f}"))
+        self.lines = [] # Currently displayed lines
+
+    def load_ranking(self, ranked_albums):
+        """Show a list of albums sorted by score (from Artist.ranked_albums)."""
+        if ranked_albums:
+            name_width = max(len(name) for name in [album.name for album in ranked_albums] + ["name"])
+            year_width = max(len(str(year)) for year in [album.release_year for album in ranked_albums] + ["year"])
+            lines = [f"{'name':>{name_width}} {'year':>{year_width}} {'score':>5}"]
+            lines += [f"{album.name:>{name_width}} {album.release_year:>{year_width}} {album.final_score:>5.2f}"
+                      for album in ranked_albums]
+        else:
+            lines = ["No albums have been ranked yet."]
+
+        if len(lines) == len(self.lines):
+            patch_text_lines(self.ranking_text, {i: line for i, (line, old_line) in enumerate(zip(lines, self.lines))
+                                                 if line != old_line})
         else:
-            self.ranking_text.insert(tk.END, "No albums have been ranked yet.")
-        self.ranking_text.config(state=tk.DISABLED)
+            set_text_lines(self.ranking_text, lines)
+        self.lines = lines
 
 
 class Pages(Enum):
@@ -0,0 +1,277 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from classes import saved_ranks_fit
+from consts import PATH
+from utils import get_headers, ARTIST_IDS
+
+CACHE_FILE = '.verified.json'  # Saved next to the ranking files, ignored by their '*.json' pattern
+WORKERS = 8
+RATE = 5.  # Requests per second, shared by all workers
+BUDGET = 1000  # Maximal number of requests in one run
+MAX_RETRIES = 3
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class RateLimiter:
+    """Spaces requests evenly across threads and stops after a total budget of requests."""
+
+    def __init__(self, rate=RATE, budget=BUDGET):
+        self.interval = 1. / rate
+        self.budget = budget
+        self.used = 0
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            if self.budget is not None and self.used >= self.budget:
+                raise BudgetExceeded(f"Request budget of {self.budget} exhausted")
+            self.used += 1
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def delay(self, seconds):
+        """Push back all requests, e.g. after a 429 response."""
+        with self._lock:
+            self._next_time = max(self._next_time, time.monotonic() + seconds)
+
+
+def api_get(limiter, url, params=None):
+    """GET a Spotify API URL within the rate limit, retrying when rate limited by the server."""
+    for _ in range(MAX_RETRIES):
+        limiter.wait()
+        response = requests.get(url, headers=get_headers(), params=params)
+        if response.status_code == 429:
+            limiter.delay(float(response.headers.get('Retry-After', 1)))
+            continue
+        response.raise_for_status()
+        return response.json()
+    raise requests.exceptions.RequestException(f"Still rate limited after {MAX_RETRIES} attempts: {url}")
+
+
+def find_artist_id(limiter, artist_name):
+    """Return the artist's ID, like choose_artist_headless, but searching within the rate limit."""
+    if artist_name in ARTIST_IDS:
+        return ARTIST_IDS[artist_name]
+    search_results = api_get(limiter, 'https://api.spotify.com/v1/search',
+                             {'q': artist_name, 'type': 'artist', 'limit': 1})
+    if search_results['artists']['items']:
+        return search_results['artists']['items'][0]['id']
+    return None
+
+
+def fetch_albums(limiter, artist_id):
+    """Return {album name: album id} of the artist's current albums, like Artist.iter_albums sees them."""
+    albums = {}
+    url = f'https://api.spotify.com/v1/artists/{artist_id}/albums'
+    params = {'include_groups': 'album', 'limit': 50}
+    while url:
+        albums_data = api_get(limiter, url, params)
+        for album_data in albums_data.get('items', []):
+            albums.setdefault(album_data.get('name', 'Unknown Album'), album_data.get('id'))
+        url = albums_data.get('next')
+        params = None  # The next URL already includes the query
+    return albums
+
+
+def fetch_num_songs(limiter, album_id):
+    """Return the number of tracks on an album, without fetching the tracks themselves."""
+    tracks_data = api_get(limiter, f'https://api.spotify.com/v1/albums/{album_id}/tracks', {'limit': 1})
+    return tracks_data.get('total', len(tracks_data['items']))
+
+
+def normalize_name(name):
+    """Strip edition suffixes like '(Remastered)' or ' - Deluxe', to recognize renamed albums."""
+    name = re.sub(r'\s*[\(\[].*?[\)\]]', '', name)
+    name = name.split(' - ')[0]
+    return re.sub(r'[^0-9a-z]', '', name.casefold())
+
+
+def file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def entry_hash(album_data):
+    """Hash of one album's saved entry, so an album is checked again only when its entry changes."""
+    return hashlib.sha1(json.dumps(album_data, sort_keys=True).encode()).hexdigest()
+
+
+def check_artist(limiter, file_path, cached=None):
+    """Validate the saved ranks of one artist against the current tracklists.
+
+    Returns a report with the albums that are ok, hold only the first page of ranks saved before
+    paging (padded on load), have ranks that do not fit the tracklist (mismatch, reset on load),
+    were probably renamed, or no longer exist (orphaned), along with the new cache entry.
+    Track counts of albums verified before (same album ID and unchanged saved entry) are not fetched again.
+    """
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    report = {"artist": name, "ok": [], "padded": [], "mismatch": [], "renamed": [], "orphaned": [], "error": None}
+    cached = cached or {}
+    artist_id = cached.get("id")
+    try:
+        # Hash and parse the same bytes, so the cached hash matches the data that was checked,
+        # even if the file is saved again in between
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha1(content).hexdigest()
+        data = json.loads(content)
+
+        if artist_id is None:
+            artist_id = find_artist_id(limiter, name)
+            if artist_id is None:
+                raise ValueError(f"Artist '{name}' not found.")
+        current_albums = fetch_albums(limiter, artist_id)
+
+        cached_albums = cached.get("albums", {})
+        verified = {}
+        unmatched = {normalize_name(album_name): album_name for album_name in current_albums if album_name not in data}
+        for album_name, album_data in data.items():
+            num_ranks = len((album_data or {}).get('ranks') or [])
+            if album_name in current_albums:
+                album_id = current_albums[album_name]
+                album_hash = entry_hash(album_data)
+                cached_album = cached_albums.get(album_name, {})
+                if cached_album.get("id") == album_id and cached_album.get("entry") == album_hash:
+                    num_songs = cached_album["num_songs"]
+                else:
+                    num_songs = fetch_num_songs(limiter, album_id)
+                if num_songs == num_ranks:
+                    report["ok"].append(album_name)
+                    verified[album_name] = {"id": album_id, "entry": album_hash, "num_songs": num_songs}
+                elif saved_ranks_fit(num_ranks, num_songs):
+                    # Album.set_ranks pads these, nothing is lost
+                    report["padded"].append({"album": album_name, "ranks": num_ranks, "songs": num_songs})
+                    verified[album_name] = {"id": album_id, "entry": album_hash, "num_songs": num_songs}
+                else:
+                    report["mismatch"].append({"album": album_name, "ranks": num_ranks, "songs": num_songs})
+            elif normalize_name(album_name) in unmatched:
+                new_name = unmatched.pop(normalize_name(album_name))
+                num_songs = fetch_num_songs(limiter, current_albums[new_name])
+                report["renamed"].append({"album": album_name, "new_name": new_name,
+                                          "ranks": num_ranks, "songs": num_songs})
+            else:
+                report["orphaned"].append(album_name)
+
+        report["cache"] = {"id": artist_id, "albums": verified}
+        if not (report["mismatch"] or report["renamed"]):
+            # Nothing to act on (orphaned albums are dropped by the next save), skip the file until it changes
+            report["cache"]["hash"] = digest
+    except BudgetExceeded as e:
+        report["error"] = f"Skipped: {e}"
+    except Exception as e:
+        # Any failure (e.g. an unexpected API payload) only fails this artist, not the whole run
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["artist_id"] = artist_id
+    return report
+
+
+def load_cache(path=PATH):
+    cache_path = os.path.join(path, CACHE_FILE)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                return json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error loading verification cache from {cache_path}: {e}")
+    return {}
+
+
+def save_cache(cache, path=PATH):
+    cache_path = os.path.join(path, CACHE_FILE)
+    try:
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=4)
+    except IOError as e:
+        print(f"Error saving verification cache to {cache_path}: {e}")
+
+
+def check_library(path=PATH, workers=WORKERS, rate=RATE, budget=BUDGET, force=False):
+    """Check every saved artist in parallel.
+
+    Artists whose file did not change since a check without mismatches or renames are skipped,
+    and albums verified before are not fetched again unless their saved entry changed.
+
+    Returns the list of reports of the checked artists.
+    """
+    cache = load_cache(path)
+    limiter = RateLimiter(rate, budget)
+    get_headers()  # Authenticate once before the workers start
+
+    to_check = []
+    skipped = 0
+    for file_path in sorted(glob.glob(os.path.join(path, '*.json'))):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        cached = cache.get(name, {})
+        if not force and "hash" in cached and cached["hash"] == file_hash(file_path):
+            skipped += 1
+            continue
+        # With --force, only the artist ID is reused and every album is fetched again
+        to_check.append((file_path, {"id": cached.get("id")} if force else cached))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        reports = list(executor.map(lambda args: check_artist(limiter, *args), to_check))
+
+    for report in reports:
+        if "cache" in report:
+            cache[report["artist"]] = report.pop("cache")
+        elif report["artist_id"] is not None:
+            # Keep the artist ID and the albums verified before, so the next run does not fetch them again
+            cache[report["artist"]] = dict(cache.get(report["artist"], {}), id=report["artist_id"])
+            cache[report["artist"]].pop("hash", None)
+    save_cache(cache, path)
+    print(f"Checked {len(reports)} artists using {limiter.used} requests "
+          f"({skipped} unchanged artists were skipped)")
+    return reports
+
+
+def print_report(reports):
+    for report in reports:
+        if report["error"]:
+            print(f"{report['artist']}: {report['error']}")
+            continue
+        print(f"{report['artist']}: {len(report['ok'])} ok")
+        for padded in report["padded"]:
+            print(f"  padded:   {padded['album']} has {padded['ranks']} saved ranks (from before paging) "
+                  f"and {padded['songs']} songs, the rest are unranked on load")
+        for mismatch in report["mismatch"]:
+            print(f"  mismatch: {mismatch['album']} has {mismatch['ranks']} saved ranks but {mismatch['songs']} songs, "
+                  f"they are reset on load")
+        for renamed in report["renamed"]:
+            print(f"  renamed:  {renamed['album']} -> {renamed['new_name']} "
+                  f"({renamed['ranks']} saved ranks, {renamed['songs']} songs)")
+        for orphaned in report["orphaned"]:
+            print(f"  orphaned: {orphaned}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the saved rankings against the current Spotify tracklists.")
+    parser.add_argument("--path", default=PATH, help="directory of the ranking files")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="number of artists checked in parallel")
+    parser.add_argument("--rate", type=float, default=RATE, help="maximal requests per second")
+    parser.add_argument("--budget", type=int, default=BUDGET, help="maximal number of requests")
+    parser.add_argument("--force", action="store_true", help="check artists that were already verified")
+    parser.add_argument("--report", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    reports = check_library(args.path, args.workers, args.rate, args.budget, args.force)
+    print_report(reports)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(reports, f, indent=4)
@@ -0,0 +1,231 @@
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote, parse_qs
+
+from classes import final_score
+from consts import PATH
+
+HOST = '127.0.0.1'
+PORT = 8000
+RELOAD_INTERVAL = 1.  # Minimal number of seconds between checks for changed ranking files
+
+
+def clean(value):
+    """Convert NaN (as saved by Album.dump) to None so the response is valid JSON."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def album_entry(name, data):
+    """Summarize a saved album the same way Album.show_rank does, without fetching its songs."""
+    ranks = [clean(rank) for rank in data.get('ranks') or []]
+    valid_ranks = [rank for rank in ranks if rank is not None]
+    s_value = sum(valid_ranks) / len(valid_ranks) if valid_ranks else None
+    e_value = clean(data.get('e'))
+    r_value = clean(data.get('r'))
+    score = final_score(s_value, e_value, r_value) if s_value is not None else None
+    return {
+        "name": name,
+        "songs": [{"number": i + 1, "score": rank} for i, rank in enumerate(ranks)],
+        "s": s_value,
+        "e": e_value,
+        "r": r_value,
+        "score": score,
+    }
+
+
+class RankingIndex:
+    """In-memory index of the ranking files in PATH, reloaded when the files change."""
+
+    def __init__(self, path=PATH, reload_interval=RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.artists = {}  # Artist name -> {album name -> album entry}
+        self.leaderboard = []  # Ranked albums of all artists, sorted by score
+        self.etag = None
+        self._stats = {}  # File path -> (mtime_ns, size)
+        self._last_check = 0.
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        """Reload the files that changed since the last check."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < self.reload_interval:
+                return
+            self._last_check = now
+
+            stats = {}
+            for file_path in glob.glob(os.path.join(self.path, '*.json')):
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue  # Removed while listing
+                stats[file_path] = (stat.st_mtime_ns, stat.st_size)
+            if stats == self._stats and self.etag is not None:
+                return
+
+            artists = dict(self.artists)
+            for file_path in set(self._stats) - set(stats):
+                artists.pop(self.artist_name(file_path), None)
+            for file_path, stat in stats.items():
+                if self._stats.get(file_path) != stat:
+                    albums = self.load_artist(file_path)
+                    if albums is None:
+                        artists.pop(self.artist_name(file_path), None)
+                    else:
+                        artists[self.artist_name(file_path)] = albums
+
+            # Swap in the new state at once, so readers never see a half built index
+            self.artists = artists
+            self.leaderboard = self.build_leaderboard(artists)
+            self._stats = stats
+            self.etag = hashlib.sha1(repr(sorted(stats.items())).encode()).hexdigest()
+
+    @staticmethod
+    def artist_name(file_path):
+        return os.path.splitext(os.path.basename(file_path))[0]
+
+    @staticmethod
+    def load_artist(file_path):
+        """Return {album name: album entry} of a ranking file, or None if it is not a valid ranking file."""
+        try:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error loading rankings from {file_path}: {e}")
+            return None
+        if not isinstance(data, dict):
+            # E.g. an integrity.py report saved in PATH
+            print(f"Skipping {file_path}: not a ranking file")
+            return None
+
+        albums = {}
+        for name, album_data in data.items():
+            if not album_data:
+                continue
+            try:
+                if not isinstance(album_data, dict):
+                    raise TypeError(f"expected a dictionary, got {type(album_data).__name__}")
+                albums[name] = album_entry(name, album_data)
+            except (AttributeError, TypeError, ValueError) as e:
+                print(f"Skipping album {name} in {file_path}: {e}")
+        return albums
+
+    @staticmethod
+    def build_leaderboard(artists):
+        ranked = [dict(artist=artist_name, name=album["name"], score=album["score"])
+                  for artist_name, albums in artists.items()
+                  for album in albums.values() if album["score"] is not None]
+        ranked.sort(key=lambda album: album["score"], reverse=True)
+        return ranked
+
+    def list_artists(self):
+        return [{"name": name, "ranked_albums": sum(album["score"] is not None for album in albums.values())}
+                for name, albums in sorted(self.artists.items())]
+
+    def sorted_albums(self, artist_name):
+        """Return the artist's ranked albums sorted by score, like Artist.sorted_albums."""
+        albums = self.artists.get(artist_name)
+        if albums is None:
+            return None
+        ranked = [album for album in albums.values() if album["score"] is not None]
+        ranked.sort(key=lambda album: album["score"], reverse=True)
+        return [{"name": album["name"], "score": album["score"]} for album in ranked]
+
+    def album(self, artist_name, album_name):
+        return self.artists.get(artist_name, {}).get(album_name)
+
+
+class RankingRequestHandler(BaseHTTPRequestHandler):
+    """Read-only JSON API over a RankingIndex.
+
+    GET /artists                          - artists with saved rankings
+    GET /artists/<artist>                 - the artist's albums sorted by score
+    GET /artists/<artist>/albums/<album>  - song scores and summary of one album
+    GET /leaderboard?limit=<n>            - best albums across all artists
+    """
+    index = None  # Set by make_server
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+
+        self.index.refresh()
+        # The index ETag changes whenever any ranking file does, so it is combined with the URL
+        etag = '"' + hashlib.sha1(f"{self.index.etag}:{self.path}".encode()).hexdigest() + '"'
+        if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        body = self.route(parts, parse_qs(url.query))
+        if body is None:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"Not found: {url.path}"})
+        else:
+            self.send_json(HTTPStatus.OK, body, etag)
+
+    def route(self, parts, query):
+        """Return the response body for the request, or None if there is no such resource."""
+        if parts == ['artists']:
+            return self.index.list_artists()
+        if len(parts) == 2 and parts[0] == 'artists':
+            return self.index.sorted_albums(parts[1])
+        if len(parts) == 4 and parts[0] == 'artists' and parts[2] == 'albums':
+            return self.index.album(parts[1], parts[3])
+        if parts == ['leaderboard']:
+            try:
+                limit = int(query.get('limit', ['50'])[0])
+            except ValueError:
+                limit = 50
+            return self.index.leaderboard[:max(limit, 0)]
+        return None
+
+    def send_json(self, status, body, etag=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Dashboards poll often, keep the console quiet
+
+
+def make_server(host=HOST, port=PORT, path=PATH):
+    """Create the HTTP server. Call serve_forever() on the result to start serving."""
+    index = RankingIndex(path)
+    index.refresh(force=True)
+    handler = type('Handler', (RankingRequestHandler,), {'index': index})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the saved rankings as a read-only JSON API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--path", default=PATH, help="directory of the ranking files")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.path)
+    print(f"Serving rankings from {args.path} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()